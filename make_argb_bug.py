@@ -7,7 +7,7 @@ vector = np.linspace(0.0, 1.0, 11)
 data = np.expand_dims(vector, axis=0)
 print("data: {}".format(data))
 
-levels = np.amin(data), np.amax(data)
+levels = data.min(), data.max()
 
 for scale in [None, 2, 3]:
     res, _ = pg.makeARGB(data, lut1, levels=levels, scale=scale)
@@ -6,20 +6,22 @@
 from __future__ import print_function, division
 
 import cProfile
+import functools
 import logging
 import os
 import pstats
-import warnings
+import weakref
 
 import numpy as np
 import pyqtgraph as pg
 
 from .bindings import QtWidgets, QtCore
+from .fastpath import asNumpy, getArrayModule, nanMinMax, uniformHistogram
 from .misc import versionStrToTuple
 from pyqtgraph import ImageItem
 
 
-from .misc import check_is_an_array, check_class
+from .misc import check_is_an_array, check_class, DEBUGGING
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,39 @@ BOTH_AXES = pg.ViewBox.XYAxes
 
 COL_PROFILING = False
 
+# Level changes smaller than this fraction of the level range are not applied to the image item.
+LEVELS_REL_TOLERANCE = 1e-6
+
+# Maximum number of times per second that the image levels are updated while dragging the axis.
+LEVELS_RATE_LIMIT = 30
+
+# Levels of the color scale image. The LUT is uint8 (see assertIsLut) so its colors are shown as
+# they are. This also prevents the image item from scanning the image to determine its levels.
+LUT_IMG_LEVELS = (0, 255)
+
+# Color scale images that are in use, so that legends with the same LUT can share them.
+_LUT_IMG_CACHE = weakref.WeakValueDictionary()
+
+
+def profiled(method):
+    """ Decorator that profiles a ColorLegendItem method if COL_PROFILING is True.
+
+        If COL_PROFILING is False the method is returned unchanged, so there is no overhead.
+    """
+    if not COL_PROFILING:
+        return method
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._profiler.enable()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._profiler.disable()
+
+    return wrapper
+
+
 def assertIsLut(lut):
     """ Checks that lut is Nx3 array of dtype uint8
 
@@ -36,11 +71,8 @@ def assertIsLut(lut):
         32-bits. This not only costs more memory but is also significantly slower.
     """
     check_is_an_array(lut)
-    assert lut.ndim == 2, "Expected 2 dimensional LUT. Got {}D".format(lut.ndim)
-    assert lut.shape[1] == 3, \
-        "Second dimension of LUT should be length 3. Got: {}".format(lut.shape[1])
-    assert lut.dtype == np.uint8, \
-        "LUT should have dtype np.uint8, got {}".format(lut.dtype)
+    assert lut.ndim == 2 and lut.shape[1] == 3 and lut.dtype == np.uint8, \
+        "Expected N x 3 LUT of dtype np.uint8. Got shape {}, dtype {}".format(lut.shape, lut.dtype)
 
 
 def extentLut(lut):
@@ -51,8 +83,11 @@ def extentLut(lut):
         fake LUT entry. See issue 792 of PyQtGraph.
         It has been fixed in PyQtGraph 1.11.0
     """
-    assertIsLut(lut)
-    extendedLut = np.append(lut, [lut[-1, :]], axis=0)
+    if __debug__:
+        assertIsLut(lut)
+    extendedLut = np.empty((len(lut) + 1, lut.shape[1]), dtype=lut.dtype)
+    extendedLut[:-1] = lut
+    extendedLut[-1] = lut[-1]
     return extendedLut
 
 
@@ -60,8 +95,52 @@ def isExtended(lut):
     """ Returns True if the lookup table has been extended with isExtended.
         I.e. returns True if the last and second to last LUT entries are the same
     """
-    assertIsLut(lut)
-    return np.array_equal(lut[-1, :], lut[-2, :])
+    if __debug__:
+        assertIsLut(lut)
+    return lut[-1, :].tobytes() == lut[-2, :].tobytes()
+
+
+def levelsAreClose(levels, otherLevels, relTol=LEVELS_REL_TOLERANCE):
+    """ Returns True if the difference between two (min, max) tuples is negligible.
+
+        The difference is negligible if it is smaller than relTol times the range of the levels.
+        Returns False if otherLevels is None, or if any of the levels is not finite (the tolerance
+        would be infinite, so invalid levels would be silently ignored instead of raising errors).
+    """
+    if otherLevels is None:
+        return False
+
+    lvlMin, lvlMax = levels
+    otherMin, otherMax = otherLevels
+    if not np.all(np.isfinite((lvlMin, lvlMax, otherMin, otherMax))):
+        return False
+
+    tolerance = relTol * abs(lvlMax - lvlMin)
+    return abs(lvlMin - otherMin) <= tolerance and abs(lvlMax - otherMax) <= tolerance
+
+
+def makeLutImage(lut, barWidth=1):
+    """ Returns an image that shows the lookup table as a color bar of barWidth pixels wide.
+
+        The image is in row-major order, i.e. it has shape (len(lut), barWidth, 3), regardless of
+        the imageAxisOrder config option. It must therefore be displayed in an ImageItem with
+        axisOrder='row-major'.
+
+        The image is read-only and shared with other callers that use the same LUT contents, as
+        long as one of them still holds a reference to it.
+    """
+    key = (lut.tobytes(), lut.shape, barWidth)
+    lutImg = _LUT_IMG_CACHE.get(key)
+    if lutImg is not None:
+        return lutImg
+
+    lutImg = np.broadcast_to(lut[:, np.newaxis, :], (len(lut), barWidth, 3))
+
+    # The broadcast array is a read-only view; make a single contiguous copy for the image item.
+    lutImg = np.ascontiguousarray(lutImg)
+    lutImg.setflags(write=False)
+    _LUT_IMG_CACHE[key] = lutImg
+    return lutImg
 
 
 class NoFiniteDataError(Exception):
@@ -130,7 +209,14 @@ class ColorLegendItem(pg.GraphicsWidget):
         self.histogramWidth = 50
         self._imageItem = None
         self._lutImg = None
+        self._shownLutImg = None  # LUT image that was last set in the colorScaleImageItem
+        self._lutLen = None  # Number of colors in the color scale. None if no LUT was set.
         self._overlayVbDragStartRange = None  # Stores positions of the drag lines at drag start
+        self._histCache = None  # (key, histogram) tuple. See _updateHistogram
+        self._histBinsCache = None  # (key, bins) tuple. See _updateHistogram
+        self._histogramIsDirty = True  # True if the histogram doesn't show the current image
+        self._lastAppliedLevels = None  # Levels that were last set in the image item
+        self._imgMinMaxCache = None  # (key, (min, max)) tuple. See autoScaleFromImage
 
         # List of mouse buttons that reset the color range when clicked.
         # You can safely modify this list.
@@ -144,7 +230,12 @@ class ColorLegendItem(pg.GraphicsWidget):
         self.histViewBox.setMouseEnabled(x=False, y=True)
         self.histViewBox.setFixedWidth(self.histogramWidth)
 
-        self.histPlotDataItem = pg.PlotDataItem()
+        # The histogram is drawn as steps by a PlotCurveItem, which avoids the overhead of a
+        # PlotDataItem. PyQtGraph 0.12.2 replaced stepMode=True by stepMode='center'. The step mode
+        # is passed to setData because setting it without data raises an exception in PyQtGraph 0.10
+        self._histStepMode = 'center' if versionStrToTuple(pg.__version__) >= (0, 12, 2) else True
+        self.histPlotDataItem = pg.PlotCurveItem()
+        self.histPlotDataItem.setPen((200, 200, 200)) # Same as the PlotDataItem default
         self.histPlotDataItem.setRotation(90)
 
         self.histViewBox.addItem(self.histPlotDataItem)
@@ -159,7 +250,9 @@ class ColorLegendItem(pg.GraphicsWidget):
         self.colorScaleViewBox.setMinimumWidth(10)
         self.colorScaleViewBox.setMaximumWidth(25)
 
-        self.colorScaleImageItem = pg.ImageItem() # image data will be set in setLut
+        # Image data will be set in setLut. The axis order is fixed so that it doesn't depend on
+        # the imageAxisOrder config option (see makeLutImage).
+        self.colorScaleImageItem = pg.ImageItem(axisOrder='row-major')
         self.colorScaleViewBox.addItem(self.colorScaleImageItem)
 
         # Overlay viewbox that will have always have the same geometry as the colorScaleViewBox.
@@ -201,6 +294,10 @@ class ColorLegendItem(pg.GraphicsWidget):
         self.mainLayout.addItem(self.histViewBox, 0, 0)
         self.mainLayout.addItem(self.colorScaleViewBox, 0, 1)
         self.mainLayout.addItem(self.axisItem, 0, 2)
+
+        # The legend itself draws nothing, only its children do. So Qt doesn't have to paint it.
+        self.setFlag(QtWidgets.QGraphicsItem.ItemHasNoContents, True)
+
         self.overlayViewBox.setParentItem(self.colorScaleViewBox.parentItem())
         self.edgeLinesViewBox.setParentItem(self.colorScaleViewBox.parentItem())
 
@@ -216,10 +313,14 @@ class ColorLegendItem(pg.GraphicsWidget):
         # Connect signals
         self.colorScaleViewBox.geometryChanged.connect(self._updateVbGeom)
 
-        # It might also trigger an update when the axis is resized (but can't reproduce it
-        # anymore). If needed we could test if the range has changed substantially before updating
-        # image levels.
-        self.overlayViewBox.sigYRangeChanged.connect(self._updateImageLevels)
+        # The range changes many times per second while dragging, and each change of the image
+        # levels renders the complete image again. A signal proxy is therefore used to limit the
+        # number of updates. It might also trigger an update when the axis is resized (but can't
+        # reproduce it anymore). Unchanged levels are not applied to the image. Programmatic
+        # changes (setLevels, onImageChanged) update the image levels directly, without delay.
+        self._levelsProxy = pg.SignalProxy(
+            self.overlayViewBox.sigYRangeChanged, rateLimit=LEVELS_RATE_LIMIT,
+            slot=self._onOverlayYRangeChanged)
 
         self.setLabel(label)
         self.showHistogram(showHistogram)
@@ -276,6 +377,10 @@ class ColorLegendItem(pg.GraphicsWidget):
         logger.debug("setImageItem")
         check_class(imageItem, ImageItem, allowNone=True)
 
+        if imageItem is self._imageItem:
+            logger.debug("Image item is already linked to the legend.")
+            return
+
         # Remove old imageItem
         if self._imageItem:
             self._imageItem.sigImageChanged.disconnect(self.onImageChanged)
@@ -296,30 +401,54 @@ class ColorLegendItem(pg.GraphicsWidget):
 
             Updates the histogram and colorize the image (_updateImageLevels)
         """
-        if self._imageItem.image is None:
+        # The image data may have been changed in-place so the cache can't be trusted anymore.
+        # Also, ImageItem.setImage may have changed the image levels (auto levels).
+        self._histCache = None
+        self._imgMinMaxCache = None
+        self._histogramIsDirty = True
+        self._lastAppliedLevels = None
+
+        if self._imageItem is None or self._imageItem.image is None:
+            # The LUT itself still exists, so _lutLen and the edge lines are kept.
             self.colorScaleImageItem.clear()
-        else:
-            self.colorScaleImageItem.setImage(self._lutImg)
+            self._shownLutImg = None
+        elif self._shownLutImg is None:
+            # The color scale doesn't depend on the image data. Only upload it again when it has
+            # been cleared, otherwise it is rendered again (by makeARGB) for every new image.
+            self.colorScaleImageItem.setImage(self._lutImg, autoLevels=False, levels=LUT_IMG_LEVELS)
+            self._shownLutImg = self._lutImg
 
         self._updateHistogram()
         self._updateImageLevels()
 
 
+    def _onOverlayYRangeChanged(self, _args):
+        """ Called by the signal proxy when the range of the overlay viewbox has changed.
+
+            The proxy emits at most LEVELS_RATE_LIMIT times per second, with the arguments of the
+            last sigYRangeChanged signal, so intermediate range changes are skipped.
+        """
+        self._updateImageLevels()
+
+
     @QtCore.Slot()
+    @profiled
     def _updateImageLevels(self):
-        """ Updates the image levels from the color levels of the
+        """ Updates the image levels from the color levels of the legend.
+
+            Does nothing if the levels haven't changed substantially since the last update (see
+            levelsAreClose). Otherwise the image is colorized again and sigLevelsChanged is emitted.
         """
-        if COL_PROFILING:
-            self._profiler.enable()
         levels = self.getLevels()
+        if levelsAreClose(levels, self._lastAppliedLevels):
+            return
+
         if self._imageItem is not None:
             self._imageItem.setLevels(levels)
+        self._lastAppliedLevels = levels
 
         self.sigLevelsChanged.emit(levels)
 
-        if COL_PROFILING:
-            self._profiler.enable()
-
 
     @property
     def subsampleStep(self):
@@ -335,45 +464,90 @@ class ColorLegendItem(pg.GraphicsWidget):
             :value: can be a scalar, a tuple with two elements, or 'auto'.
         """
         self._subsampleStep = value
+        self._histogramIsDirty = True
 
 
     def _updateHistogram(self):
         """ Updates the histogram with data from the image
+
+            If the histogram is hidden, or the legend itself is, the histogram is cleared and will
+            be updated when it is shown again (see showHistogram and showEvent).
         """
-        if not self._histogramIsVisible or self._imageItem is None or self._imageItem.image is None:
-            self.histPlotDataItem.setData([])  # seems necessary to clear data from screen
-            self.histPlotDataItem.clear()
+        if not self._histogramIsVisible or not self.histViewBox.isVisible():
+            self._clearHistogram()
+            return
+
+        self._histogramIsDirty = False
+        if self._imageItem is None or self._imageItem.image is None:
+            self._clearHistogram()
             return
 
         try:
             imgArr = self._imageItem.image
-            histRange = self._calcHistogramRange(imgArr, step=self.subsampleStep)
-
-            histBins = self._calcHistogramBins(
-                histRange, forIntegers=self._imageItemHasIntegerData(self._imageItem))
-
-            histogram = self._imageItem.getHistogram(bins=histBins, range=histRange)
 
-            assert histogram[0] is not None, "Histogram empty in imageChanged()" # when does this happen again?
+            # Reuse the histogram if the image has not changed since the last time (e.g. when the
+            # histogram is shown again). The cache is reset in onImageChanged.
+            histKey = (id(imgArr), imgArr.shape, imgArr.dtype, self.subsampleStep)
+            if self._histCache is not None and self._histCache[0] == histKey:
+                histogram = self._histCache[1]
+            else:
+                # Subsample the image once and copy it to contiguous memory, so that both the
+                # range and the histogram calculation read it sequentially.
+                xp = getArrayModule(imgArr)
+                stepData = xp.ascontiguousarray(
+                    self._subsampleImage(imgArr, step=self.subsampleStep))
+
+                histRange = self._calcHistogramRange(stepData, step=1)
+
+                # The bins only depend on the range, which often stays the same for new images
+                # (e.g. for integer data). This cache is therefore not reset in onImageChanged.
+                forIntegers = self._imageItemHasIntegerData(self._imageItem)
+                binsKey = (tuple(histRange), forIntegers)
+                if self._histBinsCache is not None and self._histBinsCache[0] == binsKey:
+                    histBins = self._histBinsCache[1]
+                else:
+                    histBins = self._calcHistogramBins(histRange, forIntegers=forIntegers)
+                    self._histBinsCache = (binsKey, histBins)
+
+                # Calculate the histogram directly instead of with ImageItem.getHistogram, which
+                # would subsample the image again and, in some versions, recalculate the range.
+                histogram = self._calcHistogram(stepData, histBins, histRange)
+                self._histCache = (histKey, histogram)
 
         except NoFiniteDataError as ex:
-            logger.debug("No finite dataa. Unable to calculate histogram: {}".format(ex))
-            self.histPlotDataItem.setData([])  # seems necessary to clear data from screen
-            self.histPlotDataItem.clear()
+            logger.debug("No finite dataa. Unable to calculate histogram: %s", ex)
+            self._clearHistogram()
         except Exception as ex:
             logger.warning("Unable to calculate histogram: {}".format(ex)) # unknown reason
-            self.histPlotDataItem.setData([])  # seems necessary to clear data from screen
-            self.histPlotDataItem.clear()
+            self._clearHistogram()
         else:
-            self.histPlotDataItem.setData(*histogram)
+            binEdges, counts = histogram
+            self.histPlotDataItem.setData(x=binEdges, y=counts, stepMode=self._histStepMode)
 
             # Discard outliers when setting the histogram height so one dominant color in the
             # image doesn't make the other colors occurrences unreadable.
-            histValues = histogram[1]
-            histYrange = np.percentile(histValues, (self.histHeightPercentile, ))[0]
+            histYrange = self._calcHistogramHeight(counts, self.histHeightPercentile)
             self.histViewBox.setRange(xRange=(-histYrange, 0), padding=None)
 
 
+    def showEvent(self, event):
+        """ Updates the histogram if the image has changed while the legend was hidden.
+
+            The show event is sent before the legend becomes visible, so the histogram is updated
+            in the next iteration of the event loop.
+        """
+        pg.GraphicsWidget.showEvent(self, event)
+        if self._histogramIsDirty:
+            QtCore.QTimer.singleShot(0, self._updateHistogram)
+
+
+    def _clearHistogram(self):
+        """ Removes the data from the histogram plot.
+        """
+        self.histPlotDataItem.clear()
+        self.histPlotDataItem.update() # PlotCurveItem.clear doesn't schedule a repaint
+
+
     @classmethod
     def _calcHistogramRange(cls, imgArr, step='auto', targetImageSize=200):
         """ Calculates bins for the histogram.
@@ -397,6 +571,17 @@ class ColorLegendItem(pg.GraphicsWidget):
         if imgArr is None or imgArr.size == 0:
             return None, None
 
+        stepData = cls._subsampleImage(imgArr, step=step, targetImageSize=targetImageSize)
+
+        return nanMinMax(stepData)
+
+
+    @classmethod
+    def _subsampleImage(cls, imgArr, step='auto', targetImageSize=200):
+        """ Returns a subsampled view of the image that is used to calculate the histogram.
+
+            See _calcHistogramRange for the meaning of *step* and *targetImageSize*.
+        """
         if step == 'auto':
             step = (max(1, int(np.ceil(imgArr.shape[0] / targetImageSize))),
                     max(1, int(np.ceil(imgArr.shape[1] / targetImageSize))))
@@ -404,15 +589,109 @@ class ColorLegendItem(pg.GraphicsWidget):
         if np.isscalar(step):
             step = (step, step)
 
-        stepData = imgArr[::step[0], ::step[1]]
+        return imgArr[::step[0], ::step[1]]
+
+
+    @classmethod
+    def _calcHistogram(cls, stepData, bins, histRange):
+        """ Calculates the histogram of the subsampled image data.
+
+            Non-finite values are discarded. The data may be a CuPy array, the counts are always
+            returned as a NumPy array.
+
+            :returns: (binEdges, counts) tuple. The binEdges array has one element more than the
+                counts array (as with np.histogram) so it can be drawn in step mode.
+        """
+        xp = getArrayModule(stepData)
+        if stepData.dtype.kind == 'f':
+            binEdges = np.asarray(bins, dtype=np.float64)
+            binWidths = np.diff(binEdges)
+            if len(binEdges) > 2 and np.allclose(binWidths, binWidths[0]):
+                return cls._calcUniformHistogram(stepData, binEdges)
+            stepData = stepData[xp.isfinite(stepData)]
+        elif (stepData.dtype.kind in 'ui' and len(bins) > 2 and
+              stepData.dtype.itemsize < np.dtype(np.intp).itemsize and
+              cls._areIntegerBins(bins)):
+            # The bin indices are calculated as np.intp so the data must fit in a smaller type.
+            return cls._calcIntegerHistogram(stepData, bins)
+
+        # Only the subsampled data is copied from the GPU in this (uncommon) case.
+        counts, binEdges = np.histogram(asNumpy(stepData), bins=bins, range=histRange)
+        return binEdges, counts
+
+
+    @classmethod
+    def _calcUniformHistogram(cls, stepData, binEdges):
+        """ Calculates the histogram of float data for bins that all have the same width.
+
+            The bin of each value is calculated by scaling the value instead of searching for it in
+            the bin edges, as np.histogram does when it gets an array of bins. Values outside the
+            bins, including NaNs and infinities, are discarded.
 
-        with warnings.catch_warnings():
-            # Suppress warnings when stepData consists of only infinite data
-            warnings.simplefilter("ignore")
-            mn = np.nanmin(stepData)
-            mx = np.nanmax(stepData)
+            :returns: (binEdges, counts) tuple, the same as np.histogram would return.
+        """
+        counts = uniformHistogram(stepData, binEdges[0], binEdges[-1], len(binEdges) - 1)
+        return binEdges, counts
+
+
+    @classmethod
+    def _areIntegerBins(cls, bins):
+        """ Returns True if the bins are integers and all have the same (positive) width.
+
+            Only then can _calcIntegerHistogram be used. Integer data can still get other bins,
+            e.g. if _imageItemHasIntegerData or _calcHistogramBins is overridden.
+        """
+        binEdges = np.asarray(bins)
+        if binEdges.dtype.kind not in 'iu':
+            return False
+        binWidths = np.diff(binEdges)
+        return bool(binWidths[0] >= 1 and np.all(binWidths == binWidths[0]))
+
+
+    @classmethod
+    def _calcIntegerHistogram(cls, stepData, bins):
+        """ Calculates the histogram of integer data by counting with np.bincount.
+
+            The bins must have an integer width and the first bin must start at the minimum of the
+            data, as calculated by _calcHistogramBins. The bin of each value can then be computed
+            directly instead of searching for it in the bin edges, as np.histogram does.
+
+            :returns: (binEdges, counts) tuple, the same as np.histogram would return.
+        """
+        xp = getArrayModule(stepData)
+        binEdges = np.asarray(bins)
+        binWidth = binEdges[1] - binEdges[0]
+        numBins = len(binEdges) - 1
+
+        if (stepData.dtype.kind == 'u' and stepData.dtype.itemsize <= 2 and
+                binEdges.dtype.kind in 'iu' and binWidth >= 1):
+            # Count the occurrences of every possible value (at most 65536) and then add the counts
+            # of the values in each bin. This avoids a per-pixel conversion and division.
+            mn, end = int(binEdges[0]), int(binEdges[-1])
+            valueCounts = xp.bincount(stepData.ravel(), minlength=end)[mn:end]
+            counts = valueCounts.reshape(numBins, int(binWidth)).sum(axis=1)
+        else:
+            binIndices = stepData.astype(np.intp) - binEdges[0]
+            if binWidth != 1:
+                binIndices //= binWidth
+            counts = xp.bincount(binIndices.ravel(), minlength=numBins)
+
+        return binEdges, asNumpy(counts)
+
+
+    @classmethod
+    def _calcHistogramHeight(cls, counts, percentile):
+        """ Returns the percentile of the histogram counts that is used as histogram height.
 
-        return (mn, mx)
+            Uses a partial sort (np.partition) to select the nearest count instead of
+            np.percentile, which sorts all counts and interpolates. For the default percentile of
+            100 the maximum is returned directly.
+        """
+        if percentile >= 100.0:
+            return counts.max()
+
+        k = int(round(percentile / 100.0 * (len(counts) - 1)))
+        return np.partition(counts, k)[k]
 
 
     @classmethod
@@ -447,11 +726,12 @@ class ColorLegendItem(pg.GraphicsWidget):
             return [mn, mx]
 
         if forIntegers:
-            # For integer data, we select the bins carefully to avoid aliasing
-            step = np.ceil((mx-mn) / float(numBins))
-            logger.debug("mn {}, mx {}, step {}, mx+1.01*step = {}"
-                         .format(mn, mx, step, mx+1.01*step))
-            bins = np.arange(mn, mx+1.01*step, step, dtype=int)
+            # For integer data, we select the bins carefully to avoid aliasing. Python integers
+            # are used so that the calculations can't overflow (e.g. for unsigned types).
+            mn, mx = int(mn), int(mx)
+            step = max(1, (mx - mn + numBins - 1) // numBins) # Rounds up
+            logger.debug("mn %s, mx %s, step %s", mn, mx, step)
+            bins = np.arange(mn, mx + step + 1, step, dtype=np.int64)
         else:
             # for float data, let numpy select the bins.
             bins = np.linspace(mn, mx, numBins)
@@ -492,12 +772,20 @@ class ColorLegendItem(pg.GraphicsWidget):
         logger.debug("Reset scale")
 
         img = self._imageItem.image
-        check_is_an_array(img, allow_none=True)
+        if __debug__ and getArrayModule(img) is np:  # CuPy arrays are allowed as well
+            check_is_an_array(img, allow_none=True)
 
         if img is None:
             levels = (0.0, 1.0)
         else:
-            levels = (np.nanmin(img), np.nanmax(img))
+            # Scanning the complete image is expensive, so the extrema are reused when the color
+            # range is reset again for the same image. The cache is reset in onImageChanged.
+            key = (id(img), img.shape, img.dtype)
+            if self._imgMinMaxCache is not None and self._imgMinMaxCache[0] == key:
+                levels = self._imgMinMaxCache[1]
+            else:
+                levels = nanMinMax(img)
+                self._imgMinMaxCache = (key, levels)
 
         self.setLevels(levels)
 
@@ -506,9 +794,11 @@ class ColorLegendItem(pg.GraphicsWidget):
         """ Gets the value range of the legend
         """
         levels = self.axisItem.range # which equals self.histViewBox.state['viewRange'][Y_AXIS]
-        assert np.allclose(self.axisItem.range, self.overlayViewBox.state['viewRange'][Y_AXIS]), \
-            "Sanity check failed {} != {}".format(self.axisItem.range,
-                                       self.overlayViewBox.state['viewRange'][Y_AXIS])
+        if DEBUGGING:
+            # The axis is linked to the overlay viewbox, so this should always hold.
+            vbLevels = self.overlayViewBox.state['viewRange'][Y_AXIS]
+            assert levelsAreClose(levels, vbLevels, relTol=1e-5), \
+                "Sanity check failed {} != {}".format(levels, vbLevels)
         return tuple(levels)
 
 
@@ -521,9 +811,14 @@ class ColorLegendItem(pg.GraphicsWidget):
         """
         #logger.debug("ColorLegendItem.setLevels: {}".format(levels), stack_info=False)
         lvlMin, lvlMax = levels
-        # Note: overlayViewBox.setYRange will call _updateImageLevels, which will
-        # emit sigLevelsChanged
-        self.overlayViewBox.setYRange(lvlMin, lvlMax, padding=padding)
+        # Setting the same range again would only cause redundant range-change signals.
+        if padding != 0 or not levelsAreClose(levels, self.getLevels()):
+            self.overlayViewBox.setYRange(lvlMin, lvlMax, padding=padding)
+
+        # The signal proxy would only update the image levels after control has returned to the
+        # event loop. Update them now, so that the image levels are up to date and
+        # sigLevelsChanged has been emitted when this method returns.
+        self._updateImageLevels()
 
 
     def getLut(self):
@@ -549,7 +844,7 @@ class ColorLegendItem(pg.GraphicsWidget):
             else:
                 # The lookup table in the imageItem already is extended. Draw the original
                 extendedLut = lut
-                lut = np.copy(lut[0:-1, :])
+                lut = lut[0:-1, :]  # View; makeLutImage copies it into the color scale image
 
             assert len(lut) == len(extendedLut) - 1, "Sanity check"
         else:
@@ -561,20 +856,18 @@ class ColorLegendItem(pg.GraphicsWidget):
 
         # Draw a color scale that shows the LUT.
         barWidth = 1
-        imgAxOrder = pg.getConfigOption('imageAxisOrder')
-        if imgAxOrder == 'col-major':
-            self._lutImg = np.ones(shape=(barWidth, len(lut), 3), dtype=lut.dtype)
-            self._lutImg[...] = lut[np.newaxis, :, :]
-        elif imgAxOrder == 'row-major':
-            self._lutImg = np.ones(shape=(len(lut), barWidth, 3), dtype=lut.dtype)
-            self._lutImg[...] = lut[:, np.newaxis, :]
-        else:
-            raise AssertionError("Unexpected imageAxisOrder config value: {}".format(imgAxOrder))
+        self._lutImg = makeLutImage(lut, barWidth=barWidth)
 
-        self.colorScaleImageItem.setImage(self._lutImg)
+        # makeLutImage returns the same (shared) image for the same LUT contents, so there is no
+        # need to render the color scale again when a LUT is set a second time. The image item
+        # stores a view of the image, so the uploaded image is remembered separately.
+        if self._shownLutImg is not self._lutImg:
+            self.colorScaleImageItem.setImage(self._lutImg, autoLevels=False, levels=LUT_IMG_LEVELS)
+            self._shownLutImg = self._lutImg
 
-        yRange = [0, len(lut)]
-        logger.debug("Setting colorScaleViewBox yrange to: {}".format(yRange))
+        self._lutLen = len(lut)
+        yRange = [0, self._lutLen]
+        logger.debug("Setting colorScaleViewBox yrange to: %s", yRange)
 
         # Do not set disableAutoRange to True in setRange; it triggers 'one last' auto range.
         # This is why the viewBox' autorange must be False at construction.
@@ -605,7 +898,8 @@ class ColorLegendItem(pg.GraphicsWidget):
         if show:
             self.histViewBox.setFixedWidth(self.histogramWidth)
             self.histPlotDataItem.show()
-            self._updateHistogram()
+            if self._histogramIsDirty:
+                self._updateHistogram()
         else:
             self.histViewBox.setFixedWidth(1) # zero gives error
             self.histPlotDataItem.hide()
@@ -631,7 +925,7 @@ class ColorLegendItem(pg.GraphicsWidget):
         """
         if fill:
             self.histPlotDataItem.setFillLevel(level)
-            self.histPlotDataItem.setFillBrush(self._histFillColor if color is None else color)
+            self.histPlotDataItem.setBrush(self._histFillColor if color is None else color)
         else:
             self.histPlotDataItem.setFillLevel(None)
 
@@ -649,7 +943,7 @@ class ColorLegendItem(pg.GraphicsWidget):
 
             Will update the LUT range at one edge while keeping the other side fixed.
         """
-        if self.getLut() is None:
+        if self._lutLen is None:
             logger.debug("Can't extend LUT edges when no LUT is defined.")
             return
 
@@ -660,9 +954,9 @@ class ColorLegendItem(pg.GraphicsWidget):
             self._setDragLinesPen(self.hoverPen) # Use the hover pen during dragging
 
             self._overlayVbDragStartRange = self.axisItem.range
-            logger.debug("Edge range at drag start: {}".format(self._overlayVbDragStartRange))
+            logger.debug("Edge range at drag start: %s", self._overlayVbDragStartRange)
 
-        orgLenLutViewBox = len(self.getLut())
+        orgLenLutViewBox = self._lutLen
         curLenLutViewBox = self.lineMax.getYPos() - self.lineMin.getYPos()
         factor = max(0.01, curLenLutViewBox / orgLenLutViewBox) # Prevent negative and zero
 
@@ -695,7 +989,7 @@ class ColorLegendItem(pg.GraphicsWidget):
         try:
             self._setDragLinesPen(self.edgePen) # revert to default pen
             self.lineMin.setValue(0)
-            lutMax = len(self.getLut()) if self.getLut() is not None else 1
+            lutMax = self._lutLen if self._lutLen is not None else 1
             self.lineMax.setValue(lutMax)
         finally:
             self.lineMin.blockSignals(oldBlockStateMin)
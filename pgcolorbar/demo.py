@@ -14,6 +14,12 @@ from pgcolorbar.colorlegend import ColorLegendItem
 logger = logging.getLogger(__name__)
 logger.setLevel('INFO')
 
+# Lookup tables. Use uint8 so that the resulting image will also be of that type.
+LUT1 = np.array([(237,248,251), (178,226,226), (102,194,164), (35,139,69), (0, 0, 0)],
+                dtype=np.uint8)
+LUT2 = np.array([(237,248,251), (204,236,230), (153,216,201), (102,194,164),
+                 (65,174,118), (35,139,69), (0,88,36)], dtype=np.uint8)
+
 class ImageLevelsConfigWidget(QtWidgets.QWidget):
     """ Config widget with two spinboxes that control the image levels.
     """
@@ -77,8 +83,8 @@ class ImageLevelsConfigWidget(QtWidgets.QWidget):
             logger.warning("Unable to QSpinBox.setStepType (only available in Qt 5.12 and later")
 
 
-        self.minLevelSpinBox.valueChanged.connect(lambda val: self.setLevels((val, None)))
-        self.maxLevelSpinBox.valueChanged.connect(lambda val: self.setLevels((None, val)))
+        self.minLevelSpinBox.valueChanged.connect(self._onMinLevelChanged)
+        self.maxLevelSpinBox.valueChanged.connect(self._onMaxLevelChanged)
         self.colorLegendItem.sigLevelsChanged.connect(self._updateSpinBoxLevels)
 
         self.resetButton = QtWidgets.QToolButton()
@@ -98,7 +104,7 @@ class ImageLevelsConfigWidget(QtWidgets.QWidget):
     def finalize(self):
         """ Should be called manually before object deletion
         """
-        logger.debug("Finalizing: {}".format(self))
+        logger.debug("Finalizing: %s", self)
         super(ImageLevelsConfigWidget, self).finalize()
 
 
@@ -106,12 +112,12 @@ class ImageLevelsConfigWidget(QtWidgets.QWidget):
         """ Sets plot levels
             :param levels: (vMin, vMax) tuple
         """
-        logger.debug("Setting image levels: {}".format(levels))
+        logger.debug("Setting image levels: %s", levels)
         minLevel, maxLevel = levels
 
         # Replace Nones by the current level
         oldMin, oldMax = self.colorLegendItem.getLevels()
-        logger.debug("Old levels: {}".format(levels))
+        logger.debug("Old levels: %s", (oldMin, oldMax))
 
         if minLevel is None: # Only maxLevel was set.
             minLevel = oldMin
@@ -126,13 +132,37 @@ class ImageLevelsConfigWidget(QtWidgets.QWidget):
         self.colorLegendItem.setLevels((minLevel, maxLevel))
 
 
+    @QtCore.Slot(float)
+    def _onMinLevelChanged(self, value):
+        """ Called when the user has changed the minimum level spinbox
+        """
+        self.setLevels((value, None))
+
+
+    @QtCore.Slot(float)
+    def _onMaxLevelChanged(self, value):
+        """ Called when the user has changed the maximum level spinbox
+        """
+        self.setLevels((None, value))
+
+
+    @QtCore.Slot(tuple)
     def _updateSpinBoxLevels(self, levels):
         """ Updates the spinboxes given the levels
+
+            The signals of the spinboxes are blocked. Otherwise the new values would be sent back
+            to the color legend, which would then emit sigLevelsChanged again.
         """
         minLevel, maxLevel = levels
-        logger.debug("_updateSpinBoxLevels: {}".format(levels))
-        self.minLevelSpinBox.setValue(minLevel)
-        self.maxLevelSpinBox.setValue(maxLevel)
+        logger.debug("_updateSpinBoxLevels: %s", levels)
+        oldBlockStateMin = self.minLevelSpinBox.blockSignals(True)
+        oldBlockStateMax = self.maxLevelSpinBox.blockSignals(True)
+        try:
+            self.minLevelSpinBox.setValue(minLevel)
+            self.maxLevelSpinBox.setValue(maxLevel)
+        finally:
+            self.minLevelSpinBox.blockSignals(oldBlockStateMin)
+            self.maxLevelSpinBox.blockSignals(oldBlockStateMax)
 
 
 
@@ -142,6 +172,11 @@ class DemoWindow(QtWidgets.QMainWindow):
     def __init__(self, lut, showHistogram, parent=None):
         super(DemoWindow, self).__init__(parent=parent)
 
+        # The noise is generated in a buffer that is reused. Only the Generator API of NumPy 1.17
+        # and higher can write (float32) random numbers into an existing array.
+        self._noiseBuffer = np.empty((300, 200), dtype=np.float32)
+        self._rng = np.random.default_rng() if hasattr(np.random, 'default_rng') else None
+
         self._setupActions()
         self._setupMenus()
         self._setupViews(lut, showHistogram)
@@ -165,6 +200,12 @@ class DemoWindow(QtWidgets.QMainWindow):
         self.noiseImgAction.setShortcut("Ctrl+N")
         self.addAction(self.noiseImgAction)
 
+        self.noise8BitsImgAction = QtWidgets.QAction("Noise (8 bits)", self)
+        self.noise8BitsImgAction.setToolTip("Sets the image data to 8 bits integer noise.")
+        self.noise8BitsImgAction.triggered.connect(self._setDataToNoise8Bits)
+        self.noise8BitsImgAction.setShortcut("Ctrl+8")
+        self.addAction(self.noise8BitsImgAction)
+
         self.myTestAction = QtWidgets.QAction("My Test", self)
         self.myTestAction.setToolTip("My test")
         self.myTestAction.triggered.connect(self.myTest)
@@ -183,6 +224,7 @@ class DemoWindow(QtWidgets.QMainWindow):
         self.dataMenu = self.menuBar.addMenu("&Data")
         self.dataMenu.addAction(self.clearImgAction)
         self.dataMenu.addAction(self.noiseImgAction)
+        self.dataMenu.addAction(self.noise8BitsImgAction)
         #self.dataMenu.addAction(self.myTestAction)
 
 
@@ -242,8 +284,10 @@ class DemoWindow(QtWidgets.QMainWindow):
     def setImage(self, img):
         """ Sets the image data
         """
-        # PyQtGraph uses the following dimension order: T, X, Y, Color.
-        self.imageItem.setImage(img.T)
+        # The image axis order is row-major (see main), so the image doesn't need to be transposed.
+        # Transposing would give a non-contiguous array, which is slower to render.
+        # Auto levels are not needed; the levels are set from the legend by autoScaleFromImage.
+        self.imageItem.setImage(img, autoLevels=False)
         nRows, nCols = img.shape
         self.plotItem.setRange(xRange=[0, nCols], yRange=[0, nRows])
         self.colorLegendItem.autoScaleFromImage()
@@ -255,7 +299,15 @@ class DemoWindow(QtWidgets.QMainWindow):
         logger.debug("_setDataToNoise")
 
         # img = np.random.randint(100, 150, size=(1216, 1936), dtype=np.uint16)
-        img = pg.gaussianFilter(np.random.normal(size=(300, 200)), (5, 5)) * 20
+        if self._rng is not None:
+            self._rng.standard_normal(out=self._noiseBuffer, dtype=np.float32)
+        else:
+            self._noiseBuffer[...] = np.random.normal(size=self._noiseBuffer.shape)
+
+        img = pg.gaussianFilter(self._noiseBuffer, (5, 5))
+        # Use float32 so that PyQtGraph can use its fast rendering path (makeARGB is not needed).
+        img = img.astype(np.float32, copy=False)
+        img *= 20  # In-place, the filter result is a new array.
         # img = np.random.normal(size=(300, 200)) * 100
 
         # Add rectangle with outliers to demonstrate the histHeightPercentile parameter
@@ -269,6 +321,25 @@ class DemoWindow(QtWidgets.QMainWindow):
         self.setImage(img)
 
 
+    def _setDataToNoise8Bits(self):
+        """ Sets image data to uint8 noise.
+
+            PyQtGraph can render 8 bits images directly with a QImage color table, which is much
+            faster than the generic makeARGB function.
+        """
+        logger.debug("_setDataToNoise8Bits")
+        shape = self._noiseBuffer.shape
+        if self._rng is not None:
+            img = self._rng.integers(0, 256, size=shape, dtype=np.uint8)
+        else:
+            img = np.random.randint(0, 256, size=shape).astype(np.uint8)
+
+        # Add rectangle with outliers to demonstrate the histHeightPercentile parameter
+        img[15:45, 25:75] = 255
+
+        self.setImage(img)
+
+
     def myTest(self):
 
         logger.info("myTest called")
@@ -284,17 +355,27 @@ def main():
     logger.info("Qt version: {}".format(pg.QtCore.QT_VERSION_STR))
     logger.info("PyQtGraph version: {}".format(pg.__version__))
 
+    # Use the Numba kernels of PyQtGraph and PgColorbar if possible. The useNumba config option
+    # only exists since PyQtGraph 0.12.2.
+    try:
+        import numba
+    except ImportError:
+        logger.info("Numba not installed.")
+    else:
+        logger.info("Numba version: {}".format(numba.__version__))
+        if 'useNumba' in pg.CONFIG_OPTIONS:
+            pg.setConfigOptions(useNumba=True)
+
+    # Use the same dimension order as NumPy (instead of the PyQtGraph default: T, X, Y, Color).
+    pg.setConfigOptions(imageAxisOrder='row-major')
+
     app = QtWidgets.QApplication([])
 
 
     cmap = pg.ColorMap([0, 0.25, 0.75, 1], [[0, 0, 0, 255], [255, 0, 0, 255], [255, 255, 0, 255], [255, 255, 255, 255]])
     lut0 = cmap.getLookupTable()
-    lut1 = np.array([(237,248,251), (178,226,226), (102,194,164), (35,139,69), (0, 0, 0)])
-    lut2 = np.array([(237,248,251), (204,236,230), (153,216,201), (102,194,164),
-                     (65,174,118), (35,139,69), (0,88,36)])
 
-    lut = lut1.astype(np.uint8) # Use uint8 so that the resulting image will also be of that type/
-    lut = np.flipud(lut) # test reversed map
+    lut = np.flipud(LUT1) # test reversed map
     win = DemoWindow(lut=lut, showHistogram=True)
     win.setGeometry(400, 100, 700, 600)
     win.setWindowTitle('PgColorbar Demo')
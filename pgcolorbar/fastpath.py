@@ -0,0 +1,130 @@
+""" Fast implementations of the array reductions that are used by the color legend.
+
+    Numba kernels are used when Numba is installed and the PyQtGraph 'useNumba' config option is
+    set. The fast-histogram package is used for histograms if it is installed. Otherwise the
+    routines fall back on plain NumPy.
+"""
+from __future__ import print_function, division
+
+import logging
+import warnings
+
+import numpy as np
+import pyqtgraph as pg
+
+try:
+    from fast_histogram import histogram1d as fastHistogram1d
+except ImportError:
+    fastHistogram1d = None
+
+logger = logging.getLogger(__name__)
+
+# Arrays with fewer elements than this are reduced by NumPy in nanMinMax. NumPy's SIMD reductions
+# are faster than the (NaN-aware, thus scalar) Numba kernel unless the work is split over threads,
+# which only pays off for large arrays.
+NAN_MIN_MAX_NUMBA_THRESHOLD = 1000000
+
+
+def numbaKernels():
+    """ Returns the module with the Numba kernels if they should be used, otherwise None.
+
+        The kernels are used when the PyQtGraph 'useNumba' config option is set (available since
+        PyQtGraph 0.12.2) and Numba is installed. Numba is imported lazily because it's slow to
+        import.
+    """
+    if not pg.CONFIG_OPTIONS.get('useNumba', False):
+        return None
+    try:
+        from . import fastpath_numba
+    except ImportError:
+        return None
+    return fastpath_numba
+
+
+def getArrayModule(arr):
+    """ Returns the cupy module if arr is a CuPy array, otherwise returns numpy.
+
+        The module of the array type is checked so that CuPy isn't imported for NumPy arrays.
+    """
+    if type(arr).__module__.split('.')[0] == 'cupy':
+        import cupy
+        return cupy
+    return np
+
+
+def asNumpy(arr):
+    """ Returns the array as a NumPy array. CuPy arrays are copied from the GPU to the host.
+    """
+    if getArrayModule(arr) is not np:
+        return arr.get()
+    return arr
+
+
+def nanMinMax(arr):
+    """ Returns the minimum and maximum of an array, ignoring NaNs.
+
+        Integer arrays can't contain NaNs, so for these the plain min() and max() are used. For
+        large float arrays both extrema are calculated in one pass by a Numba kernel if possible
+        (see numbaKernels). Otherwise np.nanmin and np.nanmax are used.
+
+        Only arrays of at least NAN_MIN_MAX_NUMBA_THRESHOLD (one million) elements go to the
+        kernel. Typical images are smaller, as is the subsample of the histogram, so by default
+        they are reduced by NumPy even if Numba is enabled.
+
+        CuPy arrays are reduced on the GPU and only the resulting scalars are transferred to the
+        host.
+
+        The extrema are returned as Python numbers, not as NumPy scalars. E.g. np.float32 scalars
+        would cause overflow warnings when PyQtGraph compares them with its float64 range limits.
+
+        Returns (nan, nan) if the array contains only NaNs.
+    """
+    xp = getArrayModule(arr)
+    if xp is not np:
+        return xp.nanmin(arr).item(), xp.nanmax(arr).item()
+
+    if arr.dtype.kind in 'uib':
+        return arr.min().item(), arr.max().item()
+
+    kernels = numbaKernels() if arr.size >= NAN_MIN_MAX_NUMBA_THRESHOLD else None
+    if kernels is not None and arr.dtype.kind == 'f':
+        # The order of the elements doesn't matter. With order='K' transposed (Fortran ordered)
+        # arrays are flattened without making a copy.
+        mn, mx = kernels.nanMinMax(arr.ravel(order='K'))
+        return float(mn), float(mx)
+
+    with warnings.catch_warnings():
+        # Suppress warnings when arr consists of only NaNs
+        warnings.simplefilter("ignore")
+        return np.nanmin(arr).item(), np.nanmax(arr).item()
+
+
+def uniformHistogram(arr, mn, mx, numBins):
+    """ Returns the histogram counts of an array for numBins bins of equal width from mn to mx.
+
+        Values outside [mn, mx], including NaNs and infinities, are discarded. As with
+        np.histogram, the last bin includes its right edge.
+
+        For float arrays a parallel Numba kernel is used if possible (see numbaKernels), or else
+        the fast-histogram package if it is installed. These calculate the bin of each value by
+        scaling it instead of searching for it in the bin edges. Otherwise np.histogram is used;
+        implementing the scaling with NumPy operations is slower than that because of the
+        temporary arrays. CuPy arrays are counted on the GPU; only the counts are copied to the
+        host.
+
+        Returns the counts as a NumPy array.
+    """
+    xp = getArrayModule(arr)
+    kernels = numbaKernels() if xp is np else None
+    if kernels is not None and arr.dtype.kind == 'f':
+        return kernels.uniformHistogram(arr.ravel(order='K'), mn, mx, numBins)
+
+    if fastHistogram1d is not None and xp is np and arr.dtype.kind == 'f':
+        # The upper limit of fast-histogram is exclusive. Increase it slightly so that the last
+        # bin includes its right edge. NaNs are discarded because they are outside the range.
+        counts = fastHistogram1d(arr, bins=numBins, range=(mn, np.nextafter(mx, np.inf)))
+        return counts.astype(np.int64)
+
+    binEdges = xp.linspace(mn, mx, numBins + 1)
+    counts, _ = xp.histogram(arr[xp.isfinite(arr)], bins=binEdges)
+    return asNumpy(counts)
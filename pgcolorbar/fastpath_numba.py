@@ -0,0 +1,77 @@
+""" Numba kernels for the routines in the fastpath module.
+
+    Importing this module raises an ImportError if Numba is not installed.
+
+    The kernels release the GIL, so they don't block other Python threads while they run.
+"""
+from __future__ import print_function, division
+
+import numba
+import numpy as np
+
+
+@numba.njit(parallel=True, nogil=True, cache=True)
+def _nanMinMaxChunked(flat, numChunks):
+    """ Calculates the min and max of each chunk of a 1D float array in parallel.
+
+        NaNs are skipped because all comparisons with NaN are False. Fastmath is not used as it
+        would allow Numba to assume that there are no NaNs.
+    """
+    chunkSize = (flat.size + numChunks - 1) // numChunks
+    mins = np.full(numChunks, np.inf)
+    maxs = np.full(numChunks, -np.inf)
+    for chunk in numba.prange(numChunks):
+        mn = np.inf
+        mx = -np.inf
+        for idx in range(chunk * chunkSize, min((chunk + 1) * chunkSize, flat.size)):
+            value = flat[idx]
+            if value < mn:
+                mn = value
+            if value > mx:
+                mx = value
+        mins[chunk] = mn
+        maxs[chunk] = mx
+    return mins.min(), maxs.max()
+
+
+def nanMinMax(flat):
+    """ Returns the minimum and maximum of a 1D float array, ignoring NaNs, in a single pass.
+
+        Returns (nan, nan) if the array contains only NaNs.
+    """
+    mn, mx = _nanMinMaxChunked(flat, numba.get_num_threads())
+    if mn > mx:  # No finite data found
+        return np.nan, np.nan
+    return mn, mx
+
+
+@numba.njit(parallel=True, nogil=True, cache=True)
+def _uniformHistogramChunked(flat, mn, mx, numBins, numChunks):
+    """ Calculates the histogram of a 1D float array for bins of equal width in parallel.
+
+        Each chunk is counted in its own row of partial counts, so the threads don't have to
+        synchronize. The rows are added at the end. Values outside [mn, mx] (including NaNs) are
+        discarded.
+    """
+    scale = numBins / (mx - mn)
+    chunkSize = (flat.size + numChunks - 1) // numChunks
+    partialCounts = np.zeros((numChunks, numBins), dtype=np.int64)
+    for chunk in numba.prange(numChunks):
+        for idx in range(chunk * chunkSize, min((chunk + 1) * chunkSize, flat.size)):
+            value = flat[idx]
+            if value >= mn and value <= mx:
+                binIdx = int((value - mn) * scale)
+                if binIdx >= numBins:  # The last bin includes its right edge
+                    binIdx = numBins - 1
+                partialCounts[chunk, binIdx] += 1
+
+    counts = np.zeros(numBins, dtype=np.int64)
+    for chunk in range(numChunks):
+        counts += partialCounts[chunk]
+    return counts
+
+
+def uniformHistogram(flat, mn, mx, numBins):
+    """ Returns the histogram counts of a 1D float array for numBins bins of equal width.
+    """
+    return _uniformHistogramChunked(flat, float(mn), float(mx), numBins, numba.get_num_threads())
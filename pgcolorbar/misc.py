@@ -45,20 +45,16 @@ except Exception as ex:
 def versionStrToTuple(versionStr):
     """ Converts a version string to tuple
 
-        E.g. 'x.y.z' to (x, y, x)
+        E.g. 'x.y.z' to (x, y, x). Elements that are not numbers, e.g. 'dev0', are kept as strings.
     """
-    versionInfo = []
-    for elem in versionStr.split('.'):
-        try:
-            versionInfo.append(int(elem))
-        except:
-            versionInfo.append(elem)
-    return tuple(versionInfo)
+    return tuple(int(elem) if elem.isdigit() else elem for elem in versionStr.split('.'))
 
 
 def is_an_array(var, allow_none=False):
     """ Returns True if var is a numpy array.
     """
+    if type(var) is np.ndarray:  # Fast path for the common case (no subclass)
+        return True
     return isinstance(var, np.ndarray) or (var is None and allow_none)
 
 